@@ -1,10 +1,16 @@
 from shiny import App, ui, render, reactive, req
+import functools
+import io
 import tempfile
+import time
 import os
-import json
 
-from rubric_converter import excel_to_rbc, rbc_to_excel, excel_to_ims, is_ims_format
+from rubric_converter import excel_to_rbc, rbc_to_excel, excel_to_ims, is_ims_format, dump_json
 
+# How long the rubric name must stay unchanged before it triggers a conversion.
+RUBRIC_NAME_DEBOUNCE_SECS = 0.5
+
+@functools.lru_cache(maxsize=256)
 def get_output_filename(input_name, output_format=None):
     base, ext = os.path.splitext(input_name)
     if ext.lower() in [".rbc", ".json"]:
@@ -84,12 +90,21 @@ def create_example_json(filepath):
         "RubricScale": scales,
         "RubricCriterionScale": criterion_scales
     }
-    with open(filepath, "w") as f:
-        json.dump(example, f, indent=2)
+    dump_json(example, filepath)
 
 def convert_json_to_excel(json_path, excel_path):
     rbc_to_excel(json_path, excel_path)
 
+@functools.lru_cache(maxsize=1)
+def example_xlsx_bytes():
+    # The example rubric is static, so build it once per process.
+    with tempfile.TemporaryDirectory() as tmpdir:
+        json_path = os.path.join(tmpdir, "example_rubric.json")
+        create_example_json(json_path)
+        buf = io.BytesIO()
+        convert_json_to_excel(json_path, buf)
+        return buf.getvalue()
+
 app_ui = ui.page_fluid(
     ui.h2("Turnitin/IMS Rubric Converter"),
     ui.tags.style("""
@@ -144,7 +159,8 @@ app_ui = ui.page_fluid(
 )
 
 def server(input, output, session):
-    converted_file = reactive.Value(None)
+    # Bytes of the converted file, kept in memory for the download handler.
+    converted_data = reactive.Value(None)
     converted_name = reactive.Value(None)
     status_message = reactive.Value("")
     uploaded_excel = reactive.Value(None)
@@ -163,7 +179,7 @@ def server(input, output, session):
         ext = os.path.splitext(in_name)[1].lower()
         if ext not in [".rbc", ".xlsx", ".json"]:
             status_message.set("Unsupported file type.")
-            converted_file.set(None)
+            converted_data.set(None)
             converted_name.set(None)
             uploaded_excel.set(None)
             uploaded_excel_name.set(None)
@@ -171,14 +187,12 @@ def server(input, output, session):
             output_format.set("turnitin")
             return
         outname = get_output_filename(in_name)
-        outpath = os.path.join(tempfile.gettempdir(), outname)
-        if os.path.exists(outpath):
-            os.remove(outpath)
         try:
             if ext in [".rbc", ".json"]:
-                rbc_to_excel(in_path, outpath)
+                buf = io.BytesIO()
+                rbc_to_excel(in_path, buf)
                 status_message.set(f"Conversion successful. Output: {outname}")
-                converted_file.set(outpath)
+                converted_data.set(buf.getvalue())
                 converted_name.set(outname)
                 uploaded_excel.set(None)
                 uploaded_excel_name.set(None)
@@ -190,12 +204,12 @@ def server(input, output, session):
                 base = os.path.splitext(in_name)[0].replace("_", " ")
                 rubric_name_value.set(base)
                 status_message.set("Excel file uploaded. Select output format, optionally edit rubric name, then convert.")
-                converted_file.set(None)
+                converted_data.set(None)
                 converted_name.set(None)
                 output_format.set("turnitin")
         except Exception as e:
             status_message.set(f"Conversion failed: {e}")
-            converted_file.set(None)
+            converted_data.set(None)
             converted_name.set(None)
             uploaded_excel.set(None)
             uploaded_excel_name.set(None)
@@ -229,23 +243,17 @@ def server(input, output, session):
     @output
     @render.ui
     def download_ui():
-        if converted_file.get():
+        if converted_data.get():
             return ui.download_button("downloadfile", "Download converted file")
         return ""
 
     @output(id="examplefile")
     @render.download(filename="example_rubric.xlsx")
     def examplefile():
-        tmpdir = tempfile.gettempdir()
-        json_path = os.path.join(tmpdir, "example_rubric.json")
-        excel_path = os.path.join(tmpdir, "example_rubric.xlsx")
-        create_example_json(json_path)
-        convert_json_to_excel(json_path, excel_path)
-        with open(excel_path, "rb") as f:
-            yield f.read()
+        yield example_xlsx_bytes()
 
     @reactive.Effect
-    @reactive.event(input.rubricname, input.output_format, uploaded_excel)
+    @reactive.event(rubric_name_value, input.output_format, uploaded_excel)
     def _():
         if uploaded_excel.get() and rubric_name_value.get():
             in_path = uploaded_excel.get()
@@ -254,34 +262,49 @@ def server(input, output, session):
             fmt = input.output_format() if input.output_format() else "turnitin"
             output_format.set(fmt)
             outname = get_output_filename(in_name, fmt)
-            outpath = os.path.join(tempfile.gettempdir(), outname)
-            if os.path.exists(outpath):
-                os.remove(outpath)
+            buf = io.BytesIO()
             try:
                 if fmt == "ims":
-                    excel_to_ims(in_path, outpath, rubric_name_override=rubric_name)
+                    excel_to_ims(in_path, buf, rubric_name_override=rubric_name)
                 else:
-                    excel_to_rbc(in_path, outpath, rubric_name_override=rubric_name)
+                    excel_to_rbc(in_path, buf, rubric_name_override=rubric_name)
                 status_message.set(f"Conversion successful. Output: {outname}")
-                converted_file.set(outpath)
+                converted_data.set(buf.getvalue())
                 converted_name.set(outname)
             except Exception as e:
                 status_message.set(f"Conversion failed: {e}")
-                converted_file.set(None)
+                converted_data.set(None)
                 converted_name.set(None)
 
+    # Debounce the rubric name: each keystroke only pushes back a deadline,
+    # and rubric_name_value (which drives the conversion) is updated once the
+    # name has stopped changing.
+    rubric_name_deadline = reactive.Value(None)
+
     @reactive.Effect
     @reactive.event(input.rubricname)
     def _():
-        if input.rubricname() is not None:
-            rubric_name_value.set(input.rubricname())
+        rubric_name_deadline.set(time.monotonic() + RUBRIC_NAME_DEBOUNCE_SECS)
+
+    @reactive.Effect
+    def _():
+        deadline = rubric_name_deadline.get()
+        if deadline is None:
+            return
+        remaining = deadline - time.monotonic()
+        if remaining > 0:
+            reactive.invalidate_later(remaining)
+            return
+        rubric_name_deadline.set(None)
+        with reactive.isolate():
+            if input.rubricname() is not None:
+                rubric_name_value.set(input.rubricname())
 
     @output(id="downloadfile")
     @render.download(filename=lambda: converted_name.get() or "converted")
     def downloadfile():
-        ofile = converted_file.get()
-        if ofile and os.path.exists(ofile):
-            with open(ofile, "rb") as f:
-                yield f.read()
+        data = converted_data.get()
+        if data:
+            yield data
 
 app = App(app_ui, server)
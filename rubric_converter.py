@@ -54,6 +54,7 @@
 #    You can override the output filename with -o OUTPUT.
 #    You can set a new rubric name (when converting Excel to any format) with
 #    -r "My Rubric Name".
+#    The JSON is written compactly; add --pretty to indent it for reading.
 #
 # 3. Upload the .rbc file back into Turnitin (The Upload option is
 #    available in the sandwich menu — the three lines menu — for the rubric.)
@@ -64,57 +65,152 @@
 #
 # -----------------------------------------------------------------------------
 
-import pandas as pd
 import json
 import argparse
 import os
-import re
 import sys
 import uuid
+import xlsxwriter
+from functools import lru_cache
+from itertools import count, islice
 from datetime import datetime, timezone
-from openpyxl.styles import Alignment
-from openpyxl.utils import get_column_letter
-
-def generate_id(start):
-    current = start
-    while True:
-        yield current
-        current += 1
+from types import MappingProxyType
+from openpyxl import load_workbook
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    CalamineWorkbook = None
+
+def load_json(path):
+    """Read a JSON file, using orjson when it is available."""
+    # Read raw bytes either way: orjson parses UTF-8 bytes directly and
+    # json.loads detects the encoding of bytes itself, so neither needs a
+    # separate (locale-dependent) text decode.
+    with open(path, 'rb') as f:
+        raw = f.read()
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def dump_json(obj, dest, pretty=False):
+    """Write obj as JSON, using orjson when it is available.
+
+    The output is compact unless pretty is true, in which case it is indented
+    by two spaces. dest may be a path or a binary file object (e.g.
+    io.BytesIO).
+    """
+    if isinstance(dest, (str, os.PathLike)):
+        with open(dest, 'wb', buffering=1 << 20) as f:
+            dump_json(obj, f, pretty=pretty)
+        return
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if pretty else 0
+        dest.write(orjson.dumps(obj, option=option))
+    else:
+        encoder = json.JSONEncoder(indent=2) if pretty else json.JSONEncoder(separators=(',', ':'))
+        # The default encoder escapes non-ASCII, so the chunks encode cleanly.
+        for chunk in encoder.iterencode(obj):
+            dest.write(chunk.encode('ascii'))
 
 def parse_desc_value(cell):
-    if not isinstance(cell, str) or cell.strip() == "":
+    # A scale cell is "desc [value]", "desc" or "[value]". The value is the
+    # bracketed text at the very end of the cell, found with str methods
+    # rather than a regex.
+    if not isinstance(cell, str):
         return None, 0
-    match = re.match(r"^(.*?)(?:\s*\[(.*?)\])?$", cell.strip())
-    if match:
-        desc = match.group(1).strip() if match.group(1) else None
-        value = match.group(2)
-        if value is not None and value != "":
-            try:
-                value = float(value)
-                if value.is_integer():
-                    value = int(value)
-            except Exception:
-                pass
-        else:
-            value = 0
-        if desc == "":
-            desc = None
-        return desc, value
-    return None, 0
+    cell = cell.strip()
+    if cell == "":
+        return None, 0
+    if not cell.endswith("]"):
+        return cell, 0
+    i = cell.rfind("[")
+    if i < 0:
+        return cell, 0
+    desc = cell[:i].rstrip() or None
+    value = cell[i + 1:-1].strip()
+    if value == "":
+        return desc, 0
+    try:
+        value = float(value)
+    except ValueError:
+        # Not a point value, so the brackets are part of the description.
+        return cell, 0
+    return desc, int(value) if value.is_integer() else value
 
 def parse_criterion_cell(cell):
     if not isinstance(cell, str) or cell.strip() == "":
         return "", ""
-    lines = cell.splitlines()
-    name = lines[0].strip() if lines else ""
-    desc = "\n".join(lines[1:]).strip() if len(lines) > 1 else ""
-    return name, desc
+    name, _, desc = cell.partition("\n")
+    return name.strip(), desc.strip()
 
 def truncate(val, n):
-    val = val or ""
-    return val[:n] if len(val) > n else val
+    # Slicing already returns short strings unchanged.
+    return (val or "")[:n]
+
+@lru_cache(maxsize=128)
+def parse_header(header):
+    """Index a header row, given as a tuple of cell values.
 
-def excel_to_rbc(input_excel, output_rbc, rubric_name_override=None):
+    Returns a read-only mapping from each text header to its (first) column
+    index, and a tuple of (column index, scale name) pairs for the
+    "(desc [value])" columns, in order. Batches of rubrics usually share one
+    header, so the result is cached.
+    """
+    col_index = {}
+    for i, name in enumerate(header):
+        if isinstance(name, str):
+            col_index.setdefault(name, i)
+    scale_columns = tuple((i, col[:-15]) for col, i in col_index.items() if col.endswith('(desc [value])'))
+    return MappingProxyType(col_index), scale_columns
+
+def read_excel_rows(input_excel):
+    """Read the first sheet of an Excel file as a parsed header and data rows.
+
+    Uses python-calamine when it is installed, and otherwise openpyxl in
+    read-only mode; either way the sheet is read without building a
+    DataFrame. Returns the two parts of parse_header() for the first row,
+    and a list of the remaining row tuples with trailing empty rows dropped,
+    each padded to the header width. Empty cells are None.
+    """
+    if CalamineWorkbook is not None:
+        wb = CalamineWorkbook.from_path(input_excel)
+        try:
+            sheet_rows = wb.get_sheet_by_index(0).to_python(skip_empty_area=False)
+        finally:
+            wb.close()
+        # calamine reports empty cells as "", openpyxl as None.
+        rows_iter = iter([tuple(None if v == "" else v for v in row) for row in sheet_rows])
+        header = next(rows_iter, ())
+        data_rows = list(rows_iter)
+    else:
+        wb = load_workbook(input_excel, read_only=True, data_only=True)
+        try:
+            ws = wb.worksheets[0]
+            # Read-only mode trusts the sheet's <dimension> element, which
+            # may be missing or wrong; recompute it from the cells instead.
+            ws.reset_dimensions()
+            rows_iter = ws.iter_rows(values_only=True)
+            header = next(rows_iter, ())
+            data_rows = list(rows_iter)
+        finally:
+            wb.close()
+    # Rows can stop short at their last non-empty cell; pad them to the
+    # header width so every column index is valid.
+    width = len(header)
+    data_rows = [row + (None,) * (width - len(row)) if len(row) < width else row
+                 for row in data_rows]
+    col_index, scale_columns = parse_header(tuple(header))
+    while data_rows and all(v is None or v == "" for v in data_rows[-1]):
+        data_rows.pop()
+    return col_index, scale_columns, data_rows
+
+def excel_to_rbc(input_excel, output_rbc, rubric_name_override=None, pretty=False):
     base = os.path.basename(input_excel)
     raw_rubric_name = os.path.splitext(base)[0].replace("_", " ")
     rubric_name = rubric_name_override or raw_rubric_name
@@ -126,28 +222,28 @@ def excel_to_rbc(input_excel, output_rbc, rubric_name_override=None):
     elif not rubric_name_override and rubric_name != raw_rubric_name:
         truncation_warnings.append(f"Rubric name truncated: '{raw_rubric_name}' → '{rubric_name}'")
 
-    df = pd.read_excel(input_excel)
+    col_index, scale_columns, data_rows = read_excel_rows(input_excel)
 
-    scale_names = [col[:-15] for col in df.columns if col.endswith('(desc [value])')]
-    scale_names_unique = []
-    for name in scale_names:
+    # One pass over the scale columns: truncate and de-duplicate the names,
+    # using a dict as an ordered set that also records each scale's column.
+    # A truncated name only has a column if some header matches it exactly.
+    seen_scales = {}
+    for i, name in scale_columns:
         truncated = truncate(name, 25)
         if name != truncated:
             truncation_warnings.append(f"Scale name truncated: '{name}' → '{truncated}'")
-        scale_names_unique.append(truncated)
-    scale_names = list(dict.fromkeys(scale_names_unique))
+            i = col_index.get(f"{truncated} (desc [value])")
+        seen_scales.setdefault(truncated, i)
+    scale_names = list(seen_scales)
 
-    scale_id_gen = generate_id(1_000_000)
-    crit_id_gen = generate_id(2_000_000)
-    cs_id_gen = generate_id(3_000_000)
+    scale_id_gen = count(1_000_000)
+    crit_id_gen = count(2_000_000)
+    cs_id_gen = count(3_000_000)
 
     rubric_scales = []
-    scale_name_to_id = {}
     for i, scale_name in enumerate(scale_names):
-        scale_id = next(scale_id_gen)
-        scale_name_to_id[scale_name] = scale_id
         rubric_scales.append({
-            "id": scale_id,
+            "id": next(scale_id_gen),
             "num": i+1,
             "position": i+1,
             "value": 0,
@@ -155,30 +251,41 @@ def excel_to_rbc(input_excel, output_rbc, rubric_name_override=None):
             "rubric": 1
         })
 
+    # Pull each column out as a plain list once, rather than looking cells up
+    # by column name for every row.
+    crit_i = col_index['Criterion (name and description)']
+    crit_col = [row[crit_i] for row in data_rows]
+    # Per-scale columns and ids are computed once, in scale order, so the
+    # row loop below only indexes plain lists.
+    scale_cols = []
+    for i in seen_scales.values():
+        scale_cols.append([row[i] for row in data_rows] if i is not None else [None] * len(data_rows))
+    scale_ids = [s['id'] for s in rubric_scales]
+
     rubric_criteria = []
     rubric_criterion_scales = []
-    for idx, row in df.iterrows():
-        crit_cell = row['Criterion (name and description)']
+    # Id lists for the Rubric record, collected as the ids are drawn.
+    all_crit_ids = []
+    all_cs_ids = []
+    for idx, crit_cell in enumerate(crit_col):
         crit_name, crit_desc = parse_criterion_cell(crit_cell)
         raw_crit_name = crit_name
         crit_name = truncate(crit_name, 13)
         if crit_name != raw_crit_name:
             truncation_warnings.append(f"Criterion name truncated: '{raw_crit_name}' → '{crit_name}'")
         crit_id = next(crit_id_gen)
-
-        crit_scales_this = []
-        for scale_name in scale_names:
-            cs_id = next(cs_id_gen)
-            cell = row.get(f"{scale_name} (desc [value])", None)
-            desc, value = parse_desc_value(cell)
-            crit_scales_this.append(cs_id)
-            rubric_criterion_scales.append({
-                "criterion": crit_id,
-                "scale_value": scale_name_to_id[scale_name],
-                "description": desc,
-                "value": value,
-                "id": cs_id
-            })
+        all_crit_ids.append(crit_id)
+
+        crit_scales_this = list(islice(cs_id_gen, len(scale_names)))
+        all_cs_ids.extend(crit_scales_this)
+        parsed_cells = [parse_desc_value(col[idx]) for col in scale_cols]
+        rubric_criterion_scales.extend({
+            "criterion": crit_id,
+            "scale_value": scale_id,
+            "description": desc,
+            "value": value,
+            "id": cs_id
+        } for cs_id, scale_id, (desc, value) in zip(crit_scales_this, scale_ids, parsed_cells))
 
         rubric_criteria.append({
             "value": 0,
@@ -194,7 +301,7 @@ def excel_to_rbc(input_excel, output_rbc, rubric_name_override=None):
 
     rubric = [{
         "total_points": None,
-        "criterion": [c['id'] for c in rubric_criteria],
+        "criterion": all_crit_ids,
         "id": 1,
         "scoring_method": 4,
         "name": rubric_name,
@@ -202,8 +309,8 @@ def excel_to_rbc(input_excel, output_rbc, rubric_name_override=None):
         "rubric_group": None,
         "is_starred": 0,
         "deleted": 0,
-        "criterion_scales_all": [cs['id'] for cs in rubric_criterion_scales],
-        "scale_values": [s['id'] for s in rubric_scales],
+        "criterion_scales_all": all_cs_ids,
+        "scale_values": scale_ids,
         "papers_scored": 0,
         "owner": 0,
         "cv_loaded": "1",
@@ -221,10 +328,10 @@ def excel_to_rbc(input_excel, output_rbc, rubric_name_override=None):
     print(f"Rubric name: {rubric_name}")
     print(f"Number of criteria: {len(rubric_criteria)}")
     print(f"Number of scales: {len(rubric_scales)}")
-    print(f"Writing to: {output_rbc}")
+    if isinstance(output_rbc, (str, os.PathLike)):
+        print(f"Writing to: {output_rbc}")
 
-    with open(output_rbc, 'w') as f:
-        json.dump(output, f, indent=2)
+    dump_json(output, output_rbc, pretty=pretty)
 
     if truncation_warnings:
         print("WARNING: The following names were truncated to meet length restrictions:", file=sys.stderr)
@@ -242,35 +349,75 @@ def format_desc_value(desc, value):
         return ""
 
 def criterion_cell(name, desc):
-    if desc and desc.strip():
-        return f"{name}\n{desc.strip()}"
+    desc = desc.strip() if desc else ""
+    if desc:
+        return f"{name}\n{desc}"
     else:
         return name
 
+# IMS rubrics have 'CFRubricCriterion' (IMS Global standard) or, in the legacy
+# format, 'criteria'; Turnitin rubrics have 'Rubric' and 'RubricCriterion'.
+_IMS_KEYS = frozenset({'CFRubricCriterion', 'criteria'})
+_TURNITIN_KEYS = frozenset({'Rubric', 'RubricCriterion'})
+
+# Longest string Excel accepts in a cell.
+_EXCEL_MAX_CELL_CHARS = 32767
+
 def is_ims_format(data):
     """Check if the JSON data is in IMS format."""
     if isinstance(data, dict):
-        # IMS format has 'CFRubricCriterion' key (IMS Global standard)
-        has_cf_rubric_criterion = 'CFRubricCriterion' in data
-        # Legacy check for older format: 'criteria' or 'type': 'Rubric'
-        has_criteria = 'criteria' in data
-        has_type = data.get('type') == 'Rubric' or data.get('@type') == 'Rubric'
         # IMS format doesn't have Turnitin-specific keys
-        has_turnitin_keys = 'Rubric' in data or 'RubricCriterion' in data
-        return (has_cf_rubric_criterion or has_criteria or has_type) and not has_turnitin_keys
+        if not _TURNITIN_KEYS.isdisjoint(data):
+            return False
+        # Legacy files may instead be marked with 'type': 'Rubric'
+        return (not _IMS_KEYS.isdisjoint(data)
+                or data.get('type') == 'Rubric' or data.get('@type') == 'Rubric')
     return False
 
-def ims_to_excel(input_ims, output_excel):
+def write_excel(output_excel, columns, rows):
+    """Write a rubric sheet: a header row, then one row per criterion.
+
+    Rows are streamed with xlsxwriter in constant_memory mode, with one
+    shared wrap-text format per column. output_excel may be a path or a
+    binary file object. Text is always written as plain strings (never as
+    hyperlinks), and over-long text is truncated to Excel's cell limit.
+    """
+    workbook = xlsxwriter.Workbook(output_excel, {'constant_memory': True, 'strings_to_urls': False})
+    worksheet = workbook.add_worksheet()
+    header_fmt = workbook.add_format({'bold': True, 'border': 1, 'text_wrap': True})
+    wrap_fmt = workbook.add_format({'text_wrap': True})
+    # Set column widths: first column 5 cm, others 3 cm (1 cm ~ 2.835 units)
+    worksheet.set_column(0, 0, 5 * 2.835, wrap_fmt)  # 5 cm
+    if len(columns) > 1:
+        worksheet.set_column(1, len(columns) - 1, 3 * 2.835, wrap_fmt)  # 3 cm
+    _write_excel_row(worksheet, 0, columns, header_fmt)
+    for r, row in enumerate(rows, 1):
+        _write_excel_row(worksheet, r, row, wrap_fmt)
+    workbook.close()
+
+def _write_excel_row(worksheet, r, row, fmt):
+    # Write cell by cell, so a value xlsxwriter rejects can't cut off the
+    # rest of the row the way write_row() does.
+    for c, val in enumerate(row):
+        if val is None or val == "":
+            worksheet.write_blank(r, c, None, fmt)
+        elif isinstance(val, str):
+            worksheet.write_string(r, c, val[:_EXCEL_MAX_CELL_CHARS], fmt)
+        else:
+            worksheet.write(r, c, val, fmt)
+
+def ims_to_excel(input_ims, output_excel, data=None):
     """Convert IMS format JSON to Excel.
     
     Supports both IMS Global CFRubric format and legacy formats.
     IMS format allows different numbers of levels for different criteria,
     so we need to create a flexible Excel structure.
-    """
-    from openpyxl.utils import get_column_letter
     
-    with open(input_ims, 'r') as f:
-        data = json.load(f)
+    If the caller has already parsed input_ims, it can pass the result as
+    data to avoid reading the file again.
+    """
+    if data is None:
+        data = load_json(input_ims)
     
     # Extract rubric information - support both CFRubric and legacy formats
     rubric_name = data.get('Title') or data.get('title', 'N/A')
@@ -350,22 +497,18 @@ def ims_to_excel(input_ims, output_excel):
     print(f"Rubric name: {rubric_name}")
     print(f"Number of criteria: {len(criteria_data)}")
     print(f"Maximum levels per criterion: {max_levels}")
-    print(f"Writing to: {output_excel}")
+    if isinstance(output_excel, (str, os.PathLike)):
+        print(f"Writing to: {output_excel}")
     
-    df = pd.DataFrame(rows, columns=columns)
-    
-    with pd.ExcelWriter(output_excel, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False)
-        worksheet = list(writer.sheets.values())[0]
-        # Set column widths: first column 5 cm, others 3 cm (1 cm ~ 2.835 units)
-        worksheet.column_dimensions[get_column_letter(1)].width = 5 * 2.835  # 5 cm
-        for col in range(2, len(columns) + 1):
-            worksheet.column_dimensions[get_column_letter(col)].width = 3 * 2.835  # 3 cm
-        for row in worksheet.iter_rows():
-            for cell in row:
-                cell.alignment = Alignment(wrap_text=True)
-
-def excel_to_ims(input_excel, output_ims, rubric_name_override=None, use_cf_format=True):
+    write_excel(output_excel, columns, rows)
+
+def uuid4_batch(n):
+    """Yield up to n random (version 4) UUID strings drawn from a single os.urandom call."""
+    pool = os.urandom(16 * n)
+    for i in range(0, 16 * n, 16):
+        yield str(uuid.UUID(bytes=pool[i:i + 16], version=4))
+
+def excel_to_ims(input_excel, output_ims, rubric_name_override=None, use_cf_format=True, pretty=False):
     """Convert Excel to IMS format JSON.
     
     IMS format allows different numbers of levels for different criteria.
@@ -373,38 +516,42 @@ def excel_to_ims(input_excel, output_ims, rubric_name_override=None, use_cf_form
     
     Args:
         input_excel: Path to input Excel file
-        output_ims: Path to output JSON file
+        output_ims: Path to output JSON file, or a binary file object
         rubric_name_override: Optional rubric name override
         use_cf_format: If True, uses CFRubric format (IMS Global standard). 
                        If False, uses legacy format. Default is True.
+        pretty: If True, indents the JSON output; otherwise it is compact.
     """
     base = os.path.basename(input_excel)
     raw_rubric_name = os.path.splitext(base)[0].replace("_", " ")
     rubric_name = rubric_name_override or raw_rubric_name
     
-    df = pd.read_excel(input_excel)
+    col_index, scale_columns, data_rows = read_excel_rows(input_excel)
     
-    # Extract level column names from column headers
-    level_columns = [col for col in df.columns if col.endswith('(desc [value])')]
+    # Resolve column positions from the header once; rows are plain tuples
+    # indexed by these integers.
+    crit_i = col_index['Criterion (name and description)']
+    level_col_indices = [i for i, _ in scale_columns]
     
     # Placeholder URI - in production this should be configurable
     base_uri = "https://example.edu/rubric"
     current_time = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S+00:00")
+    # Enough identifiers for the rubric, every criterion and every level cell.
+    uuid_iter = uuid4_batch(len(data_rows) * (len(level_col_indices) + 1) + 1)
     
     # Build criteria array
     criteria = []
     total_levels = 0
-    for idx, row in df.iterrows():
-        crit_cell = row['Criterion (name and description)']
-        crit_name, crit_desc = parse_criterion_cell(crit_cell)
+    for idx, row in enumerate(data_rows):
+        crit_name, crit_desc = parse_criterion_cell(row[crit_i])
         
         # Build levels for this criterion - only include non-empty cells
         levels = []
         level_position = 0
-        for col_idx, col_name in enumerate(level_columns):
-            cell = row.get(col_name, None)
+        for col_i in level_col_indices:
+            cell = row[col_i]
             # Skip empty cells
-            if pd.isna(cell) or (isinstance(cell, str) and cell.strip() == ""):
+            if cell is None or (isinstance(cell, str) and cell.strip() == ""):
                 continue
                 
             desc, value = parse_desc_value(cell)
@@ -417,7 +564,7 @@ def excel_to_ims(input_excel, output_ims, rubric_name_override=None, use_cf_form
                 score_str = str(value) if value is not None else "0"
                 level = {
                     "score": score_str,
-                    "Identifier": str(uuid.uuid4()),
+                    "Identifier": next(uuid_iter),
                     "URI": base_uri,
                     "lastChangeDateTime": current_time,
                     "position": level_position,
@@ -448,7 +595,7 @@ def excel_to_ims(input_excel, output_ims, rubric_name_override=None, use_cf_form
         
         if use_cf_format:
             criterion = {
-                "Identifier": str(uuid.uuid4()),
+                "Identifier": next(uuid_iter),
                 "URI": base_uri,
                 "lastChangeDateTime": current_time,
                 "position": idx + 1,
@@ -470,7 +617,7 @@ def excel_to_ims(input_excel, output_ims, rubric_name_override=None, use_cf_form
         # IMS Global CFRubric format
         output = {
             "description": "",
-            "Identifier": str(uuid.uuid4()),
+            "Identifier": next(uuid_iter),
             "URI": base_uri,
             "Title": rubric_name,
             "lastChangeDateTime": current_time,
@@ -493,45 +640,43 @@ def excel_to_ims(input_excel, output_ims, rubric_name_override=None, use_cf_form
     print(f"Rubric name: {rubric_name}")
     print(f"Number of criteria: {len(criteria)}")
     print(f"Total levels across all criteria: {total_levels}")
-    print(f"Writing to: {output_ims}")
+    if isinstance(output_ims, (str, os.PathLike)):
+        print(f"Writing to: {output_ims}")
     
-    with open(output_ims, 'w') as f:
-        json.dump(output, f, indent=2)
+    dump_json(output, output_ims, pretty=pretty)
 
 def rbc_to_excel(input_rbc, output_excel):
-    from openpyxl.utils import get_column_letter
-    from openpyxl import load_workbook
-
-    with open(input_rbc, 'r') as f:
-        data = json.load(f)
+    data = load_json(input_rbc)
     
     # Check if this is IMS format
     if is_ims_format(data):
-        # Close the file and call ims_to_excel
-        return ims_to_excel(input_rbc, output_excel)
+        # Hand the already-parsed data over rather than reading it again
+        return ims_to_excel(input_rbc, output_excel, data=data)
 
-    criteria = {c['id']: c for c in data['RubricCriterion']}
+    criteria = data['RubricCriterion']
     scales = {s['id']: s for s in data['RubricScale']}
-    criterion_scale_map = {}
+    # Keyed by (criterion id, scale id) so each cell is a single lookup.
+    criterion_scale_map = {(cs['criterion'], cs['scale_value']): cs for cs in data['RubricCriterionScale']}
 
-    for cs in data['RubricCriterionScale']:
-        crit_id = cs['criterion']
-        scale_id = cs['scale_value']
-        if crit_id not in criterion_scale_map:
-            criterion_scale_map[crit_id] = {}
-        criterion_scale_map[crit_id][scale_id] = cs
+    # Sort the scales once; the order is the same for every criterion.
+    sorted_scales = sorted(scales.values(), key=lambda x: x['position'])
+    scale_ids = [s['id'] for s in sorted_scales]
 
     columns = ['Criterion (name and description)']
-    for scale in sorted(scales.values(), key=lambda x: x['position']):
+    for scale in sorted_scales:
         columns.append(f"{scale['name']} (desc [value])")
 
     rows = []
-    for crit_id, crit in criteria.items():
+    for crit in criteria:
+        crit_id = crit['id']
         row = [criterion_cell(crit['name'], crit.get('description', ''))]
-        for scale in sorted(scales.values(), key=lambda x: x['position']):
-            cs = criterion_scale_map.get(crit_id, {}).get(scale['id'], {})
-            desc = cs.get('description', '')
-            value = cs.get('value', '')
+        for scale_id in scale_ids:
+            cs = criterion_scale_map.get((crit_id, scale_id))
+            if cs is None:
+                desc, value = '', ''
+            else:
+                desc = cs.get('description', '')
+                value = cs.get('value', '')
             row.append(format_desc_value(desc, value))
         rows.append(row)
 
@@ -540,20 +685,10 @@ def rbc_to_excel(input_rbc, output_excel):
     print(f"Rubric name: {rubric_name}")
     print(f"Number of criteria: {len(criteria)}")
     print(f"Number of scales: {len(scales)}")
-    print(f"Writing to: {output_excel}")
-
-    df = pd.DataFrame(rows, columns=columns)
+    if isinstance(output_excel, (str, os.PathLike)):
+        print(f"Writing to: {output_excel}")
 
-    with pd.ExcelWriter(output_excel, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False)
-        worksheet = list(writer.sheets.values())[0]
-        # Set column widths: first column 5 cm, others 3 cm (1 cm ~ 2.835 units)
-        worksheet.column_dimensions[get_column_letter(1)].width = 5 * 2.835  # 5 cm
-        for col in range(2, len(columns) + 1):
-            worksheet.column_dimensions[get_column_letter(col)].width = 3 * 2.835  # 3 cm
-        for row in worksheet.iter_rows():
-            for cell in row:
-                cell.alignment = Alignment(wrap_text=True)
+    write_excel(output_excel, columns, rows)
 
 def main():
     parser = argparse.ArgumentParser(
@@ -593,6 +728,7 @@ def main():
             "   You can override the output filename with -o OUTPUT.\n"
             "   You can set a new rubric name (when converting Excel to RBC) with\n"
             "   -r \"My Rubric Name\".\n"
+            "   The JSON is written compactly; add --pretty to indent it for reading.\n"
             "\n"
             "6. Upload the .rbc file back into Turnitin. (The Upload option is\n"
             "   available in the sandwich menu — the three lines menu — for the rubric.)\n"
@@ -607,6 +743,8 @@ def main():
     parser.add_argument("-r", "--rubric-name", help="Rubric name (overrides name from file name, Excel→JSON only)")
     parser.add_argument("-f", "--format", choices=["turnitin", "ims"], 
                        help="Output format when converting from Excel (default: turnitin)")
+    parser.add_argument("--pretty", action="store_true",
+                       help="Indent the JSON output when converting from Excel (default: compact)")
     args = parser.parse_args()
 
     input_ext = os.path.splitext(args.input_file)[1].lower()
@@ -625,9 +763,9 @@ def main():
         
         # Convert based on format
         if output_format == "ims":
-            excel_to_ims(args.input_file, output_file, rubric_name_override=args.rubric_name)
+            excel_to_ims(args.input_file, output_file, rubric_name_override=args.rubric_name, pretty=args.pretty)
         else:
-            excel_to_rbc(args.input_file, output_file, rubric_name_override=args.rubric_name)
+            excel_to_rbc(args.input_file, output_file, rubric_name_override=args.rubric_name, pretty=args.pretty)
     elif input_ext in (".rbc", ".json"):
         if args.output_file:
             output_excel = args.output_file